@@ -1,99 +1,148 @@
+import argparse
 from pathlib import Path
 from typing import Optional
 
-import typer
-
 from .config import parse_output_config
-from .constants import DEFAULT_IGNORE_PATTERNS
-from .filesystem import get_files_recursively, load_gitignore
-from .formatters import generate_markdown_output
+from .constants import DEFAULT_IGNORE_PATTERNS, DEFAULT_MAX_FILE_BYTES
 from .handlers import get_output_handlers
 
-app = typer.Typer(
-    name="code-to-prompt",
-    help="Convert codebases into LLM prompts",
-    add_completion=False,
-)
 
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line argument parser.
 
-@app.command()
-def main(
-    path: Optional[Path] = typer.Argument(
-        None,
+    Returns:
+        ArgumentParser for the code-to-prompt command
+    """
+    parser = argparse.ArgumentParser(
+        prog="code-to-prompt",
+        description="Convert codebases into LLM prompts",
+    )
+    parser.add_argument(
+        "path",
+        nargs="?",
+        type=Path,
+        default=None,
         help="File or directory to generate prompt from (defaults to current directory)",
-        exists=True,
-        file_okay=True,
-        dir_okay=True,
-        resolve_path=True,
-    ),
-    analyze_imports: bool = typer.Option(
-        False,
+    )
+    parser.add_argument(
         "--analyze-imports",
         "-a",
+        action="store_true",
         help="Analyze and include local imports when processing a single file",
-    ),
-    output: Optional[list[str]] = typer.Option(
-        ["console"],
+    )
+    parser.add_argument(
         "--output",
         "-o",
+        action="append",
+        metavar="DESTINATION",
         help="Output destinations (e.g., console, file=output.md). Multiple allowed.",
-    ),
-    ignore_patterns: Optional[list[str]] = typer.Option(
-        None,
+    )
+    parser.add_argument(
         "--ignore",
         "-i",
-        help="Patterns to ignore (e.g., '*.log', 'temp/'). Replaces default patterns. Use empty list to disable all patterns.",
-    ),
-    extra_ignore: Optional[list[str]] = typer.Option(
-        None,
+        dest="ignore_patterns",
+        action="append",
+        metavar="PATTERN",
+        help="Patterns to ignore (e.g., '*.log', 'temp/'). Replaces default patterns. Use --ignore '' to disable all patterns.",
+    )
+    parser.add_argument(
         "--extra-ignore",
         "-e",
+        action="append",
+        metavar="PATTERN",
         help="Additional patterns to ignore. These are added to default patterns.",
-    ),
-) -> None:
+    )
+    parser.add_argument(
+        "--follow-symlinks",
+        action="store_true",
+        help="Descend into symlinked directories in directory mode. Symlinks to directories already visited are skipped, so symlink loops are safe.",
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Print plain markdown to the console instead of rendering it. Much faster for large codebases.",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_MAX_FILE_BYTES,
+        metavar="BYTES",
+        help=f"Skip files larger than this many bytes in directory mode (default: {DEFAULT_MAX_FILE_BYTES}). Use 0 to disable the limit.",
+    )
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
     """
     Generate an LLM prompt from a codebase.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
     """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
     # Use current directory if none specified
-    working_path = path or Path.cwd()
+    working_path = (args.path or Path.cwd()).resolve()
+    if not working_path.exists():
+        parser.error(f"Path '{args.path}' does not exist.")
+
+    if args.max_bytes < 0:
+        parser.error("--max-bytes must not be negative")
 
     # Parse output configurations
-    output_configs = [parse_output_config(out) for out in output]
-    handlers = get_output_handlers(output_configs)
+    output_configs = [parse_output_config(out) for out in args.output or ["console"]]
+    try:
+        handlers = get_output_handlers(output_configs, raw=args.raw)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Imported after argument parsing so --help and usage errors stay fast
+    from .filesystem import collect_tree_and_files, load_gitignore
+    from .formatters import iter_markdown_chunks
 
     if working_path.is_file():
         print("File mode: Processing single file")
         base_dir = working_path.parent
         files = [working_path]
+        tree = None
         gitignore_spec = load_gitignore(base_dir, DEFAULT_IGNORE_PATTERNS.copy())
     else:
         print("Directory mode: Processing entire directory")
         base_dir = working_path
         # Handle ignore patterns
-        if ignore_patterns is not None:
+        if args.ignore_patterns is not None:
             # Use provided patterns (empty list disables all ignoring)
-            patterns_to_use = ignore_patterns
+            patterns_to_use = args.ignore_patterns
         else:
             # Start with default patterns
             patterns_to_use = DEFAULT_IGNORE_PATTERNS.copy()
             # Add extra patterns if provided
-            if extra_ignore:
-                patterns_to_use.extend(extra_ignore)
+            if args.extra_ignore:
+                patterns_to_use.extend(args.extra_ignore)
 
         # Load gitignore if it exists and combine with our patterns
         gitignore_spec = load_gitignore(base_dir, patterns_to_use)
 
-        # Get all files recursively, respecting gitignore
-        files = get_files_recursively(base_dir, gitignore_spec)
+        # Walk once for both the directory tree and the files, respecting gitignore
+        max_bytes = args.max_bytes or None  # 0 disables the limit
+        tree, files = collect_tree_and_files(
+            base_dir, gitignore_spec, max_bytes, args.follow_symlinks
+        )
 
-    # Generate markdown output
-    markdown_content = generate_markdown_output(
-        files, 
-        base_dir, 
+    # Generate markdown output lazily so file outputs can stream it
+    markdown_chunks = iter_markdown_chunks(
+        files,
+        base_dir,
         gitignore_spec,
-        is_file_mode=working_path.is_file()
+        is_file_mode=working_path.is_file(),
+        tree=tree,
     )
+    if len(handlers) > 1:
+        # Every handler consumes the output, so materialize the chunks once
+        markdown_chunks = list(markdown_chunks)
 
     # Send to all configured outputs
     for handler in handlers:
-        handler(markdown_content)
+        handler(markdown_chunks)
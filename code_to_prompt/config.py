@@ -1,8 +1,8 @@
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
 
 # Type aliases
-OutputHandler = Callable[[str], None]
+OutputHandler = Callable[[Iterable[str]], None]
 
 
 @dataclass
@@ -58,6 +58,16 @@ DEFAULT_IGNORE_PATTERNS = [
     "AUTHORS",
 ]
 
+# Default size limit for files included in directory mode (512 KiB)
+DEFAULT_MAX_FILE_BYTES = 512 * 1024
+
+# Number of leading bytes inspected for NUL bytes when detecting binary files
+BINARY_CHECK_SIZE = 8192
+
+# Write buffer for file output, so the many small chunks of a prompt are
+# flushed in large writes instead of one system call per few kilobytes
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
 EXTENSIONS_MAP = {
     ".py": "python",
     ".js": "javascript",
@@ -1,9 +1,291 @@
+import locale
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import (
+    TYPE_CHECKING,
+    Collection,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 from pathspec import PathSpec
+from pathspec.pattern import RegexPattern
 from pathspec.patterns import GitWildMatchPattern
-from rich import print
+from pathspec.util import CheckResult, TreeEntry, check_match_file, normalize_file
+
+from .constants import BINARY_CHECK_SIZE
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# Type aliases
+DirectoryTree = dict[Path, tuple[list[str], list[str]]]
+StrPath = Union[str, os.PathLike[str]]
+TStrPath = TypeVar("TStrPath", bound=StrPath)
+
+# Characters that make a gitignore pattern more than a plain name
+_GLOB_SPECIAL_CHARS = frozenset("*?[\\/!#")
+
+# Whether native paths must have their separators converted to forward slashes
+_NEEDS_SLASH_NORM = os.sep != "/"
+
+# Patterns matching every name with one extension, such as "*.log"
+_EXTENSION_PATTERN_RE = re.compile(r"\*\.[A-Za-z0-9_]+")
+
+# Named groups in compiled patterns, which cannot repeat within one regex
+_NAMED_GROUP_RE = re.compile(r"\(\?P<\w+>")
+
+
+def _warn(message: str) -> None:
+    """
+    Print a warning in yellow to stderr.
+
+    Warnings go to stderr so they never land inside the markdown streamed to
+    stdout when it is piped or redirected.
+
+    Args:
+        message: Warning text, without the "Warning: " prefix
+    """
+    _stderr_console().print(f"[yellow]Warning: {message}[/yellow]")
+
+
+@lru_cache(maxsize=None)
+def _stderr_console() -> "Console":
+    """
+    Create the console used for warnings on first use.
+
+    rich is imported here rather than at module level because warnings are rare
+    and importing it is a noticeable part of start-up time.
+    """
+    from rich.console import Console
+
+    return Console(stderr=True)
+
+
+def _split_fast_patterns(
+    patterns: Collection[RegexPattern],
+) -> tuple[frozenset[str], frozenset[str], list[RegexPattern]]:
+    """
+    Separate the patterns that can be matched with set lookups.
+
+    Plain names such as "node_modules" and extension patterns such as "*.log"
+    only depend on the last component of a path, so they are matched by name
+    or extension instead of by regex. Negation patterns could re-include a
+    path such a pattern excluded, so when there are any, nothing is separated.
+
+    Args:
+        patterns: Compiled gitignore patterns
+
+    Returns:
+        Tuple of plain names, extensions (without the dot) and the remaining
+        patterns
+    """
+    if any(pattern.include is False for pattern in patterns):
+        return frozenset(), frozenset(), list(patterns)
+
+    names = set()
+    extensions = set()
+    rest = []
+    for pattern in patterns:
+        source = getattr(pattern, "pattern", None)
+        if not pattern.include or not isinstance(source, str):
+            rest.append(pattern)
+        elif not any(char in source for char in _GLOB_SPECIAL_CHARS):
+            names.add(source)
+        elif _EXTENSION_PATTERN_RE.fullmatch(source):
+            extensions.add(source[2:])
+        else:
+            rest.append(pattern)
+    return frozenset(names), frozenset(extensions), rest
+
+
+def _compile_union(patterns: Iterable[RegexPattern]) -> Optional[re.Pattern[str]]:
+    """
+    Combine the compiled patterns into a single regex.
+
+    Positive patterns are joined into one alternation. Each run of negation
+    patterns then wraps everything before it in a negative lookahead,
+    "(?!neg)(?:prev)", so a path matches exactly when the last pattern matching
+    it is positive, which is gitignore's last-match-wins rule.
+
+    Args:
+        patterns: Compiled gitignore patterns
+
+    Returns:
+        Combined regex, or None if there are no positive patterns or the
+        combination is too deeply nested to compile
+    """
+    combined: Optional[str] = None
+    positives: list[str] = []
+    negations: list[str] = []
+    for pattern in patterns:
+        if pattern.include is None or pattern.regex is None:
+            continue
+        source = _NAMED_GROUP_RE.sub("(?:", pattern.regex.pattern)
+        if pattern.include:
+            if negations:
+                combined = f"(?!{_alternation(negations)})(?:{combined})"
+                negations = []
+            positives.append(source)
+        else:
+            if positives:
+                combined = _alternation([combined, *positives])
+                positives = []
+            # A negation before any positive pattern has nothing to re-include
+            if combined is not None:
+                negations.append(source)
+    if negations:
+        combined = f"(?!{_alternation(negations)})(?:{combined})"
+    if positives:
+        combined = _alternation([combined, *positives])
+    if combined is None:
+        return None
+    try:
+        return re.compile(combined)
+    except (re.error, RecursionError):
+        return None
+
+
+def _alternation(sources: list[Optional[str]]) -> str:
+    """Join regex sources into one alternation, skipping a missing first part."""
+    return "|".join(f"(?:{source})" for source in sources if source is not None)
+
+
+class CachedPathSpec(PathSpec):
+    """
+    PathSpec that memoizes directory decisions and inherits directory exclusions.
+
+    Decisions for directory paths (those ending with "/") are cached, since every
+    entry below a directory consults them, and a path inside an ignored directory
+    is ignored without being matched against the patterns itself. As in Git, a
+    file cannot be re-included once one of its parent directories is excluded.
+    File results are not cached: each file is only matched once per walk.
+
+    Plain name patterns such as "node_modules" or ".venv" (no wildcards and no
+    slashes) match a path exactly when its last component equals the name, and
+    extension patterns such as "*.log" when its last component has that
+    extension, so both are checked with set lookups instead of regexes. This is
+    only done when there are no negation patterns, which could re-include a
+    path that such a pattern excluded. The remaining patterns, negations
+    included, are tried as one combined regex instead of one at a time.
+
+    All of PathSpec's matching and checking methods go through match_file, so
+    they agree on parent exclusion. Adding patterns with += returns a new spec,
+    since the fast paths are built from the patterns when the spec is created.
+    """
+
+    def __init__(self, patterns: Iterable[RegexPattern]) -> None:
+        super().__init__(patterns)
+        self._dir_cache: dict[str, bool] = {}
+        self._literal_names, self._extensions, rest = _split_fast_patterns(
+            self.patterns
+        )
+        self._union = _compile_union(rest)
+        self._has_rest = any(pattern.include is not None for pattern in rest)
+
+    def __iadd__(self, other: PathSpec) -> "CachedPathSpec":
+        # Extending self.patterns in place would leave the fast paths stale
+        return self.__add__(other)
+
+    def match_file(
+        self, file: StrPath, separators: Optional[Collection[str]] = None
+    ) -> bool:
+        return self._match_normalized(normalize_file(file, separators))
+
+    def match_files(
+        self,
+        files: Iterable[TStrPath],
+        separators: Optional[Collection[str]] = None,
+        *,
+        negate: Optional[bool] = None,
+    ) -> Iterator[TStrPath]:
+        # The base implementation loops over match_file's internals directly,
+        # which would bypass the cache, the fast paths and parent exclusion
+        match = self.match_file
+        return (file for file in files if match(file, separators) != bool(negate))
+
+    def match_entries(
+        self,
+        entries: Iterable[TreeEntry],
+        separators: Optional[Collection[str]] = None,
+        *,
+        negate: Optional[bool] = None,
+    ) -> Iterator[TreeEntry]:
+        match = self.match_file
+        return (
+            entry
+            for entry in entries
+            if match(entry.path, separators) != bool(negate)
+        )
+
+    def check_file(
+        self, file: TStrPath, separators: Optional[Collection[str]] = None
+    ) -> CheckResult[TStrPath]:
+        path = normalize_file(file, separators)
+        # A file inside an excluded directory is decided by that directory
+        checked = self._excluded_parent(path) or path
+        include, index = check_match_file(enumerate(self.patterns), checked)
+        return CheckResult(file, include, index)
+
+    def check_files(
+        self,
+        files: Iterable[TStrPath],
+        separators: Optional[Collection[str]] = None,
+    ) -> Iterator[CheckResult[TStrPath]]:
+        check = self.check_file
+        return (check(file, separators) for file in files)
+
+    def _match_normalized(self, path: str) -> bool:
+        """Match a normalized path, checking its parent directories first."""
+        is_dir = path.endswith("/")
+        if is_dir:
+            cached = self._dir_cache.get(path)
+            if cached is not None:
+                return cached
+
+        # Check the parent directory first; its result is cached for siblings
+        parent, _, name = path.rstrip("/").rpartition("/")
+        result = bool(parent) and self._match_normalized(parent + "/")
+        result = (
+            result
+            or name in self._literal_names
+            or self._has_extension(name)
+            or self._match_patterns(path)
+        )
+        if is_dir:
+            self._dir_cache[path] = result
+        return result
+
+    def _excluded_parent(self, path: str) -> Optional[str]:
+        """Return the outermost excluded parent directory of a normalized path."""
+        prefix = ""
+        for part in path.rstrip("/").split("/")[:-1]:
+            prefix += part + "/"
+            if self._match_normalized(prefix):
+                return prefix
+        return None
+
+    def _has_extension(self, name: str) -> bool:
+        """Check a path component against the extension patterns."""
+        if not self._extensions:
+            return False
+        _, dot, extension = name.rpartition(".")
+        return bool(dot) and extension in self._extensions
+
+    def _match_patterns(self, path: str) -> bool:
+        """Match a normalized path against the patterns without a fast path."""
+        if self._union is not None:
+            return self._union.match(path) is not None
+        if not self._has_rest:
+            return False
+        # The combined regex could not be built; all patterns give the same answer
+        include, _ = check_match_file(enumerate(self.patterns), path)
+        return bool(include)
 
 
 def load_gitignore(directory: Path, additional_patterns: list[str]) -> PathSpec:
@@ -15,7 +297,7 @@ def load_gitignore(directory: Path, additional_patterns: list[str]) -> PathSpec:
         additional_patterns: List of additional patterns to include in the PathSpec
 
     Returns:
-        PathSpec object combining .gitignore patterns (if they exist) and additional patterns
+        CachedPathSpec object combining .gitignore patterns (if they exist) and additional patterns
     """
     patterns = additional_patterns.copy()  # Start with our additional patterns
 
@@ -24,22 +306,105 @@ def load_gitignore(directory: Path, additional_patterns: list[str]) -> PathSpec:
     if gitignore_path.is_file():
         try:
             with gitignore_path.open("r", encoding="utf-8") as f:
-                # Filter out empty lines and comments
-                gitignore_patterns = [
-                    line.strip()
-                    for line in f
-                    if line.strip() and not line.startswith("#")
-                ]
-                patterns.extend(gitignore_patterns)
+                # Filter out empty lines and comments (including indented ones)
+                for line in f:
+                    pattern = line.strip()
+                    if pattern and not pattern.startswith("#"):
+                        patterns.append(pattern)
         except Exception as e:
-            print(f"[yellow]Warning: Error reading .gitignore file: {e}[/yellow]")
+            _warn(f"Error reading .gitignore file: {e}")
+
+    # Each call gets its own spec: specs can be extended and their directory
+    # caches grow with use, so sharing one between callers is unsafe. Skip
+    # empty patterns as from_lines does.
+    return CachedPathSpec(
+        [_compile_pattern(pattern) for pattern in patterns if pattern]
+    )
+
+
+@lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str) -> GitWildMatchPattern:
+    """
+    Compile a single gitignore pattern.
+
+    Compiled patterns are immutable, so they are shared between specs. The
+    default ignore patterns are then compiled once per process rather than
+    on every call to load_gitignore.
+    """
+    return GitWildMatchPattern(pattern)
+
+
+def get_relative_path(path: Path, base_dir: Path) -> Optional[str]:
+    """
+    Get the path relative to base_dir as a string with forward slashes.
+
+    The relative part is sliced off the string form of the path, which avoids
+    the cost of Path.relative_to and of raising ValueError for outside paths.
+
+    Args:
+        path: The path to convert
+        base_dir: The directory the result is relative to
+
+    Returns:
+        Relative path with forward slashes, or None if path is not inside base_dir
+    """
+    path_str = str(path)
+    base_prefix = _base_prefix(base_dir)
+    if not path_str.startswith(base_prefix):
+        return None
+    relative_path = path_str[len(base_prefix) :]
+    # Use forward slashes for consistency (only needed where os.sep differs)
+    if _NEEDS_SLASH_NORM and os.sep in relative_path:
+        relative_path = relative_path.replace(os.sep, "/")
+    return relative_path
+
+
+@lru_cache(maxsize=16)
+def _base_prefix(base_dir: Path) -> str:
+    """Return the base directory as a string ending with a separator."""
+    return os.path.join(str(base_dir), "")
+
+
+def should_ignore_rel(
+    relative_path: str,
+    gitignore_spec: Optional[PathSpec],
+    is_dir: bool = False,
+) -> bool:
+    """
+    Check if a relative POSIX path should be ignored.
 
-    # Create PathSpec from all patterns
-    return PathSpec.from_lines(GitWildMatchPattern, patterns)
+    This is the string-based core of should_ignore, for callers that already
+    carry relative paths and should not build Path objects just to check them.
+
+    Args:
+        relative_path: Path relative to the base directory, with forward slashes
+        gitignore_spec: The parsed gitignore patterns
+        is_dir: Whether the path is a directory, so directory-only patterns
+            such as "temp/" can match it
+
+    Returns:
+        True if the path should be ignored, False otherwise
+    """
+    # Always ignore .git directory (a substring test avoids splitting the path;
+    # the plain check first skips building the padded string for most paths)
+    if ".git" in relative_path and "/.git/" in f"/{relative_path}/":
+        return True
+
+    # Check gitignore patterns if they exist
+    if gitignore_spec is None:
+        return False
+
+    # Directory patterns only match paths ending with a slash
+    if is_dir:
+        relative_path += "/"
+    return gitignore_spec.match_file(relative_path)
 
 
 def should_ignore(
-    path: Path, base_dir: Path, gitignore_spec: Optional[PathSpec]
+    path: Path,
+    base_dir: Path,
+    gitignore_spec: Optional[PathSpec],
+    is_dir: bool = False,
 ) -> bool:
     """
     Check if a path should be ignored based on gitignore rules and default Git behavior.
@@ -48,81 +413,277 @@ def should_ignore(
         path: The path to check
         base_dir: The base directory of the project
         gitignore_spec: The parsed gitignore patterns
+        is_dir: Whether the path is a directory, so directory-only patterns
+            such as "temp/" can match it
 
     Returns:
         True if the path should be ignored, False otherwise
     """
-    # Always ignore .git directory
+    relative_path = get_relative_path(path, base_dir)
+    if relative_path is None:
+        return False
+    return should_ignore_rel(relative_path, gitignore_spec, is_dir)
+
+
+def _scan_directory(
+    path: str, follow_symlinks: bool = False
+) -> tuple[list[str], list[os.DirEntry[str]]]:
+    """
+    List the subdirectories and regular files of a directory in one scandir pass.
+
+    Entry types come from the directory listing itself, so no stat call is
+    needed except to resolve symlinks. Symlinked directories are only listed
+    as subdirectories when following symlinks, and special files such as FIFOs
+    are skipped.
+
+    Args:
+        path: The directory to list
+        follow_symlinks: Whether symlinks to directories count as subdirectories
+
+    Returns:
+        Tuple of subdirectory names and file entries, in directory order
+    """
+    dirnames = []
+    file_entries = []
     try:
-        relative_parts = path.relative_to(base_dir).parts
-        if ".git" in relative_parts:
-            return True
-    except ValueError:
-        pass
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    dirnames.append(entry.name)
+                elif entry.is_file():
+                    file_entries.append(entry)
+    except OSError as e:
+        _warn(f"Could not read directory {path}: {e}")
+    return dirnames, file_entries
 
-    # Check gitignore patterns if they exist
-    if gitignore_spec is None:
+
+def _exceeds_size(entry: os.DirEntry[str], max_bytes: Optional[int]) -> bool:
+    """
+    Check whether a file entry is larger than the size limit.
+
+    Args:
+        entry: Directory entry of the file
+        max_bytes: Maximum file size in bytes, or None for no limit
+
+    Returns:
+        True if the file is larger than max_bytes, False otherwise
+    """
+    if max_bytes is None:
+        return False
+    try:
+        return entry.stat().st_size > max_bytes
+    except OSError:
         return False
 
-    # Convert to relative path for gitignore matching
+
+def _first_visit(path: str, visited: set[tuple[int, int]]) -> bool:
+    """
+    Record a directory as visited, identified by its device and inode.
+
+    Args:
+        path: The directory, possibly reached through a symlink
+        visited: Identities of the directories visited so far, updated in place
+
+    Returns:
+        True if the directory had not been visited yet, False if it had been or
+        cannot be accessed
+    """
     try:
-        relative_path = str(path.relative_to(base_dir))
-        # Use forward slashes for consistency (important for Windows)
-        relative_path = relative_path.replace("\\", "/")
-        return gitignore_spec.match_file(relative_path)
-    except ValueError:
+        st = os.stat(path)
+    except OSError:
+        return False
+    key = (st.st_dev, st.st_ino)
+    if key in visited:
         return False
+    visited.add(key)
+    return True
 
 
-def get_files_recursively(
-    directory: Path, gitignore_spec: Optional[PathSpec] = None
-) -> list[Path]:
+def collect_tree_and_files(
+    directory: Path,
+    gitignore_spec: Optional[PathSpec] = None,
+    max_bytes: Optional[int] = None,
+    follow_symlinks: bool = False,
+) -> tuple[DirectoryTree, list[Path]]:
     """
-    Recursively get all files in a directory, respecting gitignore rules.
+    Walk a directory once, collecting both its tree structure and its files.
+
+    Symlinked directories are not followed by default. When they are, a
+    symlink is skipped if its target has already been walked, so symlink
+    cycles cannot loop forever. Real directories are always walked, even when
+    a symlink elsewhere in the tree already led to them.
 
     Args:
         directory: The directory to search in
         gitignore_spec: Optional PathSpec object with gitignore patterns
+        max_bytes: Files larger than this many bytes are left out like ignored
+            files, with a warning for each (default: no limit)
+        follow_symlinks: Whether to descend into symlinked directories
 
     Returns:
-        List of Path objects for all non-ignored files
+        Tuple of the directory tree, mapping each visited directory to its
+        non-ignored subdirectory and file names (sorted case-insensitively),
+        and the list of Path objects for all non-ignored files, in the order
+        they appear in the tree view
     """
-    files = []
+    # Directory listings are keyed by path string while walking; Path objects
+    # are only created for the returned tree and files
+    listings: dict[str, tuple[list[str], list[str]]] = {}
+    match = gitignore_spec.match_file if gitignore_spec is not None else None
+    visited: set[tuple[int, int]] = set()
+    if follow_symlinks:
+        _first_visit(str(directory), visited)
 
-    for item in directory.rglob("*"):
-        # Skip if it's not a file
-        if not item.is_file():
-            continue
+    # Each stack item is a directory path and its relative POSIX prefix
+    stack = [(str(directory), "")]
+    while stack:
+        root, rel_prefix = stack.pop()
+        dirnames, file_entries = _scan_directory(root, follow_symlinks)
+
+        # Prune ignored directories so they are never scanned.
+        # The trailing slash lets directory-only patterns such as "temp/" match.
+        kept_dirs = sorted(
+            (
+                name
+                for name in dirnames
+                if name != ".git" and not (match and match(f"{rel_prefix}{name}/"))
+            ),
+            key=str.lower,
+        )
+        if follow_symlinks:
+            # Real directories are always kept and recorded first, so a symlink
+            # never hides a sibling it points to; symlinks are skipped once
+            # their target has been visited
+            links = {
+                name for name in kept_dirs if os.path.islink(os.path.join(root, name))
+            }
+            for name in kept_dirs:
+                if name not in links:
+                    _first_visit(os.path.join(root, name), visited)
+            kept_dirs = [
+                name
+                for name in kept_dirs
+                if name not in links or _first_visit(os.path.join(root, name), visited)
+            ]
+
+        kept_files = []
+        for entry in file_entries:
+            name = entry.name
+            # Skip if it matches gitignore patterns
+            if name == ".git" or (match and match(rel_prefix + name)):
+                continue
+            # Only files that survive the patterns are stat'ed for their size
+            if _exceeds_size(entry, max_bytes):
+                # Unlike ignored files, the user may expect these in the output
+                _warn(f"Skipped {entry.path}: larger than {max_bytes} bytes")
+                continue
+
+            kept_files.append(name)
+        # Sort only what survived filtering, by name rather than by entry
+        kept_files.sort(key=str.lower)
+
+        listings[root] = (kept_dirs, kept_files)
+        # Push in reverse so directories are visited in sorted order
+        stack.extend(
+            (os.path.join(root, name), f"{rel_prefix}{name}/")
+            for name in reversed(kept_dirs)
+        )
+
+    tree: DirectoryTree = {Path(root): listing for root, listing in listings.items()}
+    return tree, _files_in_tree_order(listings, str(directory))
 
-        # Skip if it matches gitignore patterns
-        if should_ignore(item, directory, gitignore_spec):
-            continue
 
-        files.append(item)
+def _files_in_tree_order(
+    listings: dict[str, tuple[list[str], list[str]]], directory: str
+) -> list[Path]:
+    """
+    List the files of collected directory listings in tree view order.
+
+    Within each directory the files of its subdirectories come first, then its
+    own files, matching the tree view, so the result never needs sorting.
 
+    Args:
+        listings: Kept subdirectory and file names, keyed by directory path
+        directory: The root directory of the walk
+
+    Returns:
+        List of Path objects for all files in the listings
+    """
+    files = []
+    # A directory is pushed twice: once to expand its subdirectories and,
+    # below them on the stack, once to emit its own files after theirs
+    stack = [(directory, False)]
+    while stack:
+        root, subdirs_done = stack.pop()
+        subdirs, filenames = listings.get(root, ([], []))
+        if subdirs_done:
+            files.extend(Path(os.path.join(root, name)) for name in filenames)
+        else:
+            stack.append((root, True))
+            stack.extend(
+                (os.path.join(root, name), False) for name in reversed(subdirs)
+            )
     return files
 
 
+def get_files_recursively(
+    directory: Path, gitignore_spec: Optional[PathSpec] = None
+) -> list[Path]:
+    """
+    Recursively get all files in a directory, respecting gitignore rules.
+
+    Args:
+        directory: The directory to search in
+        gitignore_spec: Optional PathSpec object with gitignore patterns
+
+    Returns:
+        List of Path objects for all non-ignored files
+    """
+    return collect_tree_and_files(directory, gitignore_spec)[1]
+
+
 def read_file_content(file_path: Path) -> Optional[str]:
     """
     Safely read the content of a file with proper encoding handling.
 
+    Binary files are detected from a NUL byte in their first block and skipped
+    without reading the rest of the file.
+
+    The file is read unbuffered: a buffered reader would add an isatty ioctl,
+    a seek and, for small files, a second read to confirm the end of file,
+    more than doubling the system calls for the typical source file.
+
     Args:
         file_path: Path object for the file to read
 
     Returns:
-        File content as string if successful, None if reading fails
+        File content as string if successful, None if reading fails or the file is binary
     """
     try:
-        # Try UTF-8 first
-        return file_path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        try:
-            # Fallback to system default encoding
-            return file_path.read_text()
-        except Exception as e:
-            print(f"[yellow]Warning: Could not read file {file_path}: {e}[/yellow]")
-            return None
+        with file_path.open("rb", buffering=0) as f:
+            head = f.read(BINARY_CHECK_SIZE)
+            if b"\x00" in head:
+                return None
+            # A short first block means the whole file has been read already,
+            # which is the common case for source files (reads of regular
+            # files only come back short at the end of the file)
+            if len(head) < BINARY_CHECK_SIZE:
+                data = head
+            else:
+                # Re-read from the start rather than concatenating head and
+                # rest, which would copy the whole file once more; the first
+                # block comes straight from the page cache
+                f.seek(0)
+                data = f.read()
     except FileNotFoundError:
-        print(f"[yellow]Warning: File not found: {file_path}[/yellow]")
+        _warn(f"File not found: {file_path}")
+        return None
+    except OSError as e:
+        _warn(f"Could not read file {file_path}: {e}")
         return None
+
+    # Decode the in-memory bytes; falling back never re-reads the file
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode(locale.getpreferredencoding(False), errors="replace")
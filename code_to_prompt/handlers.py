@@ -1,65 +1,100 @@
+import os
+from functools import partial
 from pathlib import Path
-
-import typer
-from rich import print
-from rich.markdown import Markdown
+from typing import Iterable, Union
 
 from .config import OutputConfig, OutputHandler
+from .constants import OUTPUT_BUFFER_SIZE
 
 
-def console_output(content: str) -> None:
+def console_output(content: Iterable[str], raw: bool = False) -> None:
     """
-    Output content to console using rich formatting.
+    Output content to the console, rendered by rich or as plain markdown.
+
+    When the console is not a terminal (output is piped or redirected), or raw
+    output is requested, the markdown is streamed as-is, skipping the cost of
+    parsing and syntax highlighting it, which dominates on large prompts.
 
     Args:
-        content: Markdown content to output
+        content: Markdown content to output, as a string or an iterable of chunks
+        raw: If True, write plain markdown even when attached to a terminal
     """
-    print(Markdown(content))
+    # rich is imported lazily to keep it out of start-up for other outputs
+    import rich
+
+    console = rich.get_console()
+    if raw or not console.is_terminal:
+        try:
+            # A plain string is written whole rather than character by character
+            if isinstance(content, str):
+                console.file.write(content)
+            else:
+                console.file.writelines(content)
+        except BrokenPipeError:
+            # Exit quietly when the reader goes away (e.g. piped into head),
+            # as rich does for output it writes itself
+            console.on_broken_pipe()
+        return
 
+    from rich.markdown import Markdown
 
-def file_output(content: str, path: str) -> None:
+    # Rendering needs the whole document at once
+    rich.print(Markdown("".join(content)))
+
+
+def file_output(content: Iterable[str], path: Union[str, os.PathLike[str]]) -> None:
     """
-    Output content to a file.
+    Output content to a file, writing chunks as they are produced.
 
     Args:
-        content: Content to write to file
-        path: Path to output file
+        content: Content to write to file, as a string or an iterable of chunks
+        path: Path to output file, as a string or path-like object
     """
+    from rich import print as rich_print
+
     output_path = Path(path)
+    # A plain string is a single chunk, not an iterable of characters
+    chunks = (content,) if isinstance(content, str) else content
     try:
-        output_path.write_text(content, encoding="utf-8")
-        print(f"[green]Output written to {output_path}[/green]")
+        # Write encoded bytes directly, bypassing the text I/O layer
+        with output_path.open("wb", buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.writelines(chunk.encode("utf-8") for chunk in chunks)
+        rich_print(f"[green]Output written to {output_path}[/green]")
     except Exception as e:
-        print(f"[red]Error writing to file {output_path}: {e}[/red]")
+        rich_print(f"[red]Error writing to file {output_path}: {e}[/red]")
 
 
-def get_output_handlers(configs: list[OutputConfig]) -> list[OutputHandler]:
+def get_output_handlers(
+    configs: list[OutputConfig], raw: bool = False
+) -> list[OutputHandler]:
     """
     Create list of output handlers from configs.
 
     Args:
         configs: List of output configurations
+        raw: If True, console handlers write plain markdown instead of rendering it
 
     Returns:
         List of configured output handler functions
 
     Raises:
-        typer.BadParameter: If an invalid output type is specified
+        ValueError: If an invalid output type is specified
     """
     handlers: list[OutputHandler] = []
 
     for config in configs:
         if config.type == "console":
-            handlers.append(lambda content: console_output(content))
+            handlers.append(
+                partial(console_output, raw=True) if raw else console_output
+            )
         elif config.type == "file":
             if not config.path:
-                raise typer.BadParameter(
+                raise ValueError(
                     "File output requires a path (e.g., file=output.md)"
                 )
-            # Create a closure to capture the path
-            path = config.path
-            handlers.append(lambda content: file_output(content, path))
+            # Bind the path now; a closure over a loop variable binds late
+            handlers.append(partial(file_output, path=config.path))
         else:
-            raise typer.BadParameter(f"Unknown output type: {config.type}")
+            raise ValueError(f"Unknown output type: {config.type}")
 
     return handlers
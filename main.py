@@ -3,7 +3,7 @@
 code-to-prompt: A CLI tool to convert codebases into LLM prompts.
 """
 
-from code_to_prompt.cli import app
+from code_to_prompt.cli import main
 
 if __name__ == "__main__":
-    app()
+    main()
@@ -1,14 +1,9 @@
-import os
 from pathlib import Path
 from typing import Generator
 
 import pytest
-from typer.testing import CliRunner
 
-from code_to_prompt.cli import app
-
-# Setup test runner
-runner = CliRunner()
+from code_to_prompt.cli import main
 
 
 @pytest.fixture
@@ -37,41 +32,37 @@ def temp_project(tmp_path) -> Generator[Path, None, None]:
     yield project_dir
 
 
-def test_cli_directory_mode(temp_project):
+def test_cli_directory_mode(temp_project, monkeypatch, capsys):
     """Test CLI in directory mode (processing entire directory)."""
     # Change to the temporary project directory
-    with runner.isolated_filesystem():
-        os.chdir(str(temp_project))
-        result = runner.invoke(app)
-
-        # Check the command executed successfully
-        assert result.exit_code == 0
+    monkeypatch.chdir(temp_project)
+    main([])
+    stdout = capsys.readouterr().out
 
-        # Check output contains expected content (with rich formatting)
-        assert "Codebase Contents" in result.stdout  # Check for title without markdown
-        assert "Directory Structure" in result.stdout
-        assert "test_project" in result.stdout
-        assert "src" in result.stdout
-        assert "main.py" in result.stdout
-        assert "README.md" in result.stdout
+    # Check output contains expected content
+    assert "Codebase Contents" in stdout
+    assert "Directory Structure" in stdout
+    assert "test_project" in stdout
+    assert "src" in stdout
+    assert "main.py" in stdout
+    assert "README.md" in stdout
 
 
-def test_cli_explicit_directory(temp_project):
+def test_cli_explicit_directory(temp_project, capsys):
     """Test CLI with explicitly provided directory."""
-    result = runner.invoke(app, [str(temp_project)])
+    main([str(temp_project)])
+    stdout = capsys.readouterr().out
 
-    assert result.exit_code == 0
-    assert "Codebase Contents" in result.stdout  # Check for title without markdown
-    assert "Directory Structure" in result.stdout
-    assert "test_project" in result.stdout
+    assert "Codebase Contents" in stdout
+    assert "Directory Structure" in stdout
+    assert "test_project" in stdout
 
 
 def test_cli_custom_output_file(temp_project):
     """Test CLI with file output."""
     output_file = temp_project / "output.md"
-    result = runner.invoke(app, [str(temp_project), "--output", f"file={output_file}"])
+    main([str(temp_project), "--output", f"file={output_file}"])
 
-    assert result.exit_code == 0
     assert output_file.exists()
 
     # Check the content of the output file
@@ -80,70 +71,101 @@ def test_cli_custom_output_file(temp_project):
     assert "Directory Structure" in content
 
 
-def test_cli_ignore_patterns(temp_project):
+def test_cli_ignore_patterns(temp_project, capsys):
     """Test CLI with custom ignore patterns."""
     # Create a file that should be ignored
     log_file = temp_project / "test.log"
     log_file.write_text("This should be ignored")
 
-    result = runner.invoke(app, [str(temp_project), "--ignore", "*.log"])
+    main([str(temp_project), "--ignore", "*.log"])
+    stdout = capsys.readouterr().out
 
-    assert result.exit_code == 0
-    assert "test.log" not in result.stdout
+    assert "test.log" not in stdout
 
 
-def test_cli_extra_ignore_patterns(temp_project):
+def test_cli_extra_ignore_patterns(temp_project, capsys):
     """Test CLI with extra ignore patterns."""
     # Create files that should be ignored
     custom_file = temp_project / "custom.txt"
     custom_file.write_text("This should be ignored")
 
-    result = runner.invoke(app, [str(temp_project), "--extra-ignore", "*.txt"])
+    main([str(temp_project), "--extra-ignore", "*.txt"])
+    stdout = capsys.readouterr().out
+
+    assert "custom.txt" not in stdout
+
+
+def test_cli_max_bytes(temp_project, capsys):
+    """Test CLI skipping files above the size limit."""
+    (temp_project / "big.txt").write_text("x" * 100)
+
+    main([str(temp_project), "--max-bytes", "50"])
+    stdout = capsys.readouterr().out
 
-    assert result.exit_code == 0
-    assert "custom.txt" not in result.stdout
+    assert "big.txt" not in stdout
+    assert "main.py" in stdout
 
+    # A limit of 0 includes files of any size
+    main([str(temp_project), "--max-bytes", "0"])
+    assert "big.txt" in capsys.readouterr().out
 
-def test_cli_multiple_outputs(temp_project):
+
+def test_cli_raw_output(temp_project, capsys):
+    """Test CLI printing plain markdown with --raw."""
+    main([str(temp_project), "--raw"])
+    stdout = capsys.readouterr().out
+
+    assert "# Codebase Contents" in stdout
+    assert "```python\nprint('Hello, World!')\n```" in stdout
+
+
+def test_cli_multiple_outputs(temp_project, capsys):
     """Test CLI with multiple output destinations."""
     output_file = temp_project / "output.md"
-    result = runner.invoke(
-        app,
-        [str(temp_project), "--output", "console", "--output", f"file={output_file}"],
+    main(
+        [str(temp_project), "--output", "console", "--output", f"file={output_file}"]
     )
+    stdout = capsys.readouterr().out
 
-    assert result.exit_code == 0
-    # Check console output (with rich formatting)
-    assert "Directory mode: Processing entire directory" in result.stdout
-    assert "Codebase Contents" in result.stdout
+    # Check console output
+    assert "Directory mode: Processing entire directory" in stdout
+    assert "Codebase Contents" in stdout
     # Check file output (should be markdown)
     assert output_file.exists()
     assert "# Codebase Contents" in output_file.read_text()
 
 
-def test_cli_file_mode(temp_project):
+def test_cli_file_mode(temp_project, capsys):
     """Test CLI in file mode (processing single file)."""
     python_file = temp_project / "src" / "main.py"
-    result = runner.invoke(app, [str(python_file)])
+    main([str(python_file)])
+    stdout = capsys.readouterr().out
 
-    assert result.exit_code == 0
-    assert "File mode: Processing single file" in result.stdout
-    assert "File Summary" in result.stdout
-    assert "Directory Structure" not in result.stdout
-    assert "File Contents" in result.stdout
-    assert "main.py" in result.stdout
+    assert "File mode: Processing single file" in stdout
+    assert "File Summary" in stdout
+    assert "Directory Structure" not in stdout
+    assert "File Contents" in stdout
+    assert "main.py" in stdout
 
 
-def test_cli_analyze_imports(temp_project):
+def test_cli_analyze_imports(temp_project, capsys):
     """Test CLI with analyze-imports flag."""
     python_file = temp_project / "src" / "main.py"
-    result = runner.invoke(app, [str(python_file), "--analyze-imports"])
+    main([str(python_file), "--analyze-imports"])
+    stdout = capsys.readouterr().out
 
-    assert result.exit_code == 0
-    assert "File mode: Processing single file" in result.stdout
+    assert "File mode: Processing single file" in stdout
 
 
 def test_cli_non_existent_path():
     """Test CLI with non-existent directory."""
-    result = runner.invoke(app, ["non_existent_dir"])
-    assert result.exit_code != 0  # Should fail
+    with pytest.raises(SystemExit) as exc_info:
+        main(["non_existent_dir"])
+    assert exc_info.value.code != 0  # Should fail
+
+
+def test_cli_invalid_output_type(temp_project):
+    """Test CLI with an unknown output destination."""
+    with pytest.raises(SystemExit) as exc_info:
+        main([str(temp_project), "--output", "invalid"])
+    assert exc_info.value.code != 0
@@ -1,12 +1,20 @@
+import os
+import re
 from pathlib import Path
 
 import pytest
+from pathspec import PathSpec
+from pathspec.patterns import GitWildMatchPattern
 
+from code_to_prompt.constants import DEFAULT_IGNORE_PATTERNS
 from code_to_prompt.filesystem import (
+    collect_tree_and_files,
     get_files_recursively,
+    get_relative_path,
     load_gitignore,
     read_file_content,
     should_ignore,
+    should_ignore_rel,
 )
 
 
@@ -46,6 +54,11 @@ def test_load_gitignore(temp_dir):
     assert not gitignore_spec.match_file("test.txt")
     assert not gitignore_spec.match_file("subdir/file.txt")
 
+    # Batch matching applies the same rules
+    paths = ["temp/keep.txt", "subdir/file.txt"]
+    assert list(gitignore_spec.match_files(paths)) == ["temp/keep.txt"]
+    assert list(gitignore_spec.match_files(paths, negate=True)) == ["subdir/file.txt"]
+
 
 def test_should_ignore(temp_dir):
     """Test if files are correctly identified for ignoring."""
@@ -62,6 +75,10 @@ def test_should_ignore(temp_dir):
     # Test .git directory is always ignored
     git_file = temp_dir / ".git" / "config"
     assert should_ignore(git_file, temp_dir, gitignore_spec)
+    nested_git_file = temp_dir / "subdir" / ".git" / "HEAD"
+    assert should_ignore(nested_git_file, temp_dir, gitignore_spec)
+    # Names that merely start with .git are not the .git directory
+    assert not should_ignore(temp_dir / ".github" / "ci.yml", temp_dir, gitignore_spec)
 
 
 def test_get_files_recursively(temp_dir):
@@ -90,7 +107,7 @@ def test_get_files_recursively(temp_dir):
     assert Path(".gitignore") not in file_paths  # Ignored by pattern
 
 
-def test_read_file_content(temp_dir):
+def test_read_file_content(temp_dir, capsys):
     """Test file content reading with different encodings."""
     # Test reading UTF-8 file
     test_file = temp_dir / "test.txt"
@@ -100,3 +117,405 @@ def test_read_file_content(temp_dir):
     # Test reading non-existent file
     nonexistent = temp_dir / "nonexistent.txt"
     assert read_file_content(nonexistent) is None
+    # Warnings stay out of the markdown written to stdout
+    captured = capsys.readouterr()
+    assert "File not found" in captured.err
+    assert "File not found" not in captured.out
+
+
+def test_get_files_recursively_prunes_ignored_directories(temp_dir):
+    """Test that directory-only patterns exclude everything below the directory."""
+    temp = temp_dir / "temp"
+    temp.mkdir()
+    (temp / "cache.txt").write_text("should be ignored")
+    (temp_dir / ".git").mkdir()
+    (temp_dir / ".git" / "HEAD").write_text("ref: refs/heads/main")
+
+    gitignore_spec = load_gitignore(temp_dir, [".gitignore"])
+    files = get_files_recursively(temp_dir, gitignore_spec)
+    file_paths = {f.relative_to(temp_dir) for f in files}
+
+    assert Path("temp") / "cache.txt" not in file_paths
+    assert Path(".git") / "HEAD" not in file_paths
+    assert Path("test.txt") in file_paths
+
+    # Directory patterns only apply to directories
+    assert should_ignore(temp, temp_dir, gitignore_spec, is_dir=True)
+    assert not should_ignore(temp, temp_dir, gitignore_spec)
+
+
+def test_load_gitignore_excludes_children_of_ignored_directories(temp_dir):
+    """Test that files cannot be re-included once their parent directory is ignored."""
+    (temp_dir / ".gitignore").write_text("temp/\n!temp/keep.txt")
+    gitignore_spec = load_gitignore(temp_dir, [])
+
+    assert gitignore_spec.match_file("temp/keep.txt")
+    assert gitignore_spec.match_file("temp/nested/file.txt")
+    # Repeated queries are served from the cache with the same result
+    assert gitignore_spec.match_file("temp/keep.txt")
+    assert not gitignore_spec.match_file("subdir/file.txt")
+
+
+def test_load_gitignore_check_apis_follow_parent_exclusion(temp_dir):
+    """Test that PathSpec's other matching methods agree with match_file."""
+    (temp_dir / ".gitignore").write_text("temp/\n!temp/keep.txt")
+    (temp_dir / "temp").mkdir()
+    (temp_dir / "temp" / "keep.txt").write_text("kept?")
+    gitignore_spec = load_gitignore(temp_dir, [])
+
+    # The deciding pattern is the one that excluded the parent directory
+    result = gitignore_spec.check_file("temp/keep.txt")
+    assert (result.include, result.index) == (True, 0)
+    assert not gitignore_spec.check_file("subdir/file.txt").include
+    checked = gitignore_spec.check_files(["temp/keep.txt", "test.txt"])
+    assert [result.include for result in checked] == [True, None]
+    assert list(gitignore_spec.match_tree_files(temp_dir)) == ["temp/keep.txt"]
+    entries = gitignore_spec.match_tree_entries(temp_dir, negate=True)
+    assert "temp/keep.txt" not in [entry.path for entry in entries]
+
+
+def test_load_gitignore_added_patterns_are_matched(temp_dir):
+    """Test that adding patterns with += builds a spec that uses them."""
+    gitignore_spec = load_gitignore(temp_dir, ["*.tmp"])
+    original = gitignore_spec
+
+    gitignore_spec += PathSpec.from_lines(GitWildMatchPattern, ["secret.txt"])
+
+    assert gitignore_spec.match_file("secret.txt")
+    assert gitignore_spec.match_file("cache.tmp")
+    assert not original.match_file("secret.txt")
+
+
+def test_read_file_content_binary(temp_dir):
+    """Test that binary files are skipped and invalid UTF-8 is replaced."""
+    binary_file = temp_dir / "image.png"
+    binary_file.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+    assert read_file_content(binary_file) is None
+
+    latin1_file = temp_dir / "latin1.txt"
+    latin1_file.write_bytes("café".encode("latin-1"))
+    # Falls back to the locale encoding, so only the ASCII prefix is stable
+    assert read_file_content(latin1_file).startswith("caf")
+
+
+def test_should_ignore_path_outside_base_dir(temp_dir):
+    """Test that paths outside the base directory are never ignored."""
+    gitignore_spec = load_gitignore(temp_dir, ["*.txt"])
+
+    outside = temp_dir.parent / "outside.txt"
+    assert not should_ignore(outside, temp_dir / "subdir", gitignore_spec)
+    # A sibling sharing the base directory name as a prefix is not inside it
+    sibling = temp_dir / "subdir2" / "a.txt"
+    assert not should_ignore(sibling, temp_dir / "subdir", gitignore_spec)
+
+
+def test_collect_tree_and_files(temp_dir):
+    """Test that a single walk returns both the directory tree and the files."""
+    gitignore_spec = load_gitignore(temp_dir, [".gitignore"])
+
+    tree, files = collect_tree_and_files(temp_dir, gitignore_spec)
+
+    assert tree[temp_dir] == (["subdir"], ["test.txt"])
+    assert tree[temp_dir / "subdir"] == ([], ["subfile.txt"])
+    assert set(files) == {temp_dir / "test.txt", temp_dir / "subdir" / "subfile.txt"}
+
+
+def test_load_gitignore_skips_comments_and_blank_lines(temp_dir):
+    """Test that comments, including indented ones, are not treated as patterns."""
+    (temp_dir / ".gitignore").write_text("# comment\n\n  # indented comment\n*.tmp\n")
+    gitignore_spec = load_gitignore(temp_dir, [])
+
+    assert len(gitignore_spec.patterns) == 1
+    assert gitignore_spec.match_file("cache.tmp")
+
+
+def test_get_relative_path(temp_dir):
+    """Test relative path conversion with forward slashes."""
+    nested = temp_dir / "subdir" / "subfile.txt"
+    assert get_relative_path(nested, temp_dir) == "subdir/subfile.txt"
+    assert get_relative_path(temp_dir / "test.txt", temp_dir) == "test.txt"
+    assert get_relative_path(temp_dir.parent / "other.txt", temp_dir) is None
+    # The cached base prefix must not double the separator of a root base
+    root = Path(temp_dir.anchor)
+    assert get_relative_path(root / "etc" / "hosts", root) == "etc/hosts"
+
+
+def test_collect_tree_and_files_matches_nested_paths_from_root(temp_dir):
+    """Test that anchored patterns match nested entries relative to the root."""
+    skipped = temp_dir / "subdir" / "skip"
+    skipped.mkdir()
+    (skipped / "file.txt").write_text("should be ignored")
+    (temp_dir / "skip").mkdir()
+    (temp_dir / "skip" / "file.txt").write_text("should be included")
+
+    gitignore_spec = load_gitignore(temp_dir, ["/subdir/skip/", ".gitignore"])
+    tree, files = collect_tree_and_files(temp_dir, gitignore_spec)
+
+    assert skipped not in tree
+    assert tree[temp_dir / "subdir"] == ([], ["subfile.txt"])
+    assert temp_dir / "skip" / "file.txt" in files
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_collect_tree_and_files_skips_special_files(temp_dir):
+    """Test that only regular files are collected, so reads never block on a pipe."""
+    os.mkfifo(temp_dir / "pipe")
+
+    tree, files = collect_tree_and_files(temp_dir, load_gitignore(temp_dir, []))
+
+    assert "pipe" not in tree[temp_dir][1]
+    assert temp_dir / "pipe" not in files
+
+
+def test_read_file_content_larger_than_binary_check(temp_dir):
+    """Test that files longer than the binary check block are read in full."""
+    large_file = temp_dir / "large.txt"
+    content = "line of text\n" * 5000
+    large_file.write_text(content)
+
+    assert read_file_content(large_file) == content
+
+
+def test_collect_tree_and_files_max_bytes(temp_dir, capsys):
+    """Test that files above the size limit are left out with a warning."""
+    (temp_dir / "big.txt").write_text("x" * 100)
+    gitignore_spec = load_gitignore(temp_dir, [".gitignore"])
+
+    tree, files = collect_tree_and_files(temp_dir, gitignore_spec, max_bytes=50)
+
+    assert temp_dir / "big.txt" not in files
+    assert "big.txt" not in tree[temp_dir][1]
+    assert temp_dir / "test.txt" in files
+    # The warning goes to stderr, naming the file that was left out
+    captured = capsys.readouterr()
+    assert "big.txt" in captured.err
+    assert "big.txt" not in captured.out
+
+
+def test_load_gitignore_literal_name_fast_path(temp_dir):
+    """Test that plain name patterns match by path component and respect negation."""
+    gitignore_spec = load_gitignore(temp_dir, ["node_modules", "*.pyc", "build/"])
+
+    assert gitignore_spec.match_file("node_modules/")
+    assert gitignore_spec.match_file("src/node_modules")
+    assert gitignore_spec.match_file("src/node_modules/pkg/index.js")
+    assert not gitignore_spec.match_file("src/node_modules_old/index.js")
+    assert not gitignore_spec.match_file("src/build")
+
+    # A negation may re-include a plain name, so the patterns decide
+    (temp_dir / ".gitignore").write_text("!keep.log")
+    gitignore_spec = load_gitignore(temp_dir, ["keep.log"])
+    assert not gitignore_spec.match_file("keep.log")
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "src/main.py",
+        "src/cache.pyc",
+        "build/",
+        "src/build",
+        "top.txt",
+        "src/top.txt",
+        "docs/notes.tmp",
+        "docs/sub/notes.tmp",
+        "a/x/y/b",
+    ],
+)
+def test_load_gitignore_combined_regex_matches_pathspec(temp_dir, path):
+    """Test that the combined pattern regex agrees with plain PathSpec matching."""
+    patterns = DEFAULT_IGNORE_PATTERNS + ["build/", "/top.txt", "docs/*.tmp", "a/**/b"]
+    (temp_dir / ".gitignore").unlink()
+    gitignore_spec = load_gitignore(temp_dir, patterns)
+    reference = PathSpec.from_lines(GitWildMatchPattern, patterns)
+
+    assert gitignore_spec.match_file(path) == reference.match_file(path)
+
+
+def test_should_ignore_rel(temp_dir):
+    """Test the ignore check on relative path strings."""
+    gitignore_spec = load_gitignore(temp_dir, [])
+
+    assert should_ignore_rel("debug.log", gitignore_spec)
+    assert should_ignore_rel("src/.git/config", gitignore_spec)
+    assert should_ignore_rel("temp", gitignore_spec, is_dir=True)
+    assert not should_ignore_rel("temp", gitignore_spec)
+    assert not should_ignore_rel("src/main.py", None)
+
+
+def test_collect_tree_and_files_returns_tree_order(temp_dir):
+    """Test that files come back in tree view order without sorting."""
+    (temp_dir / "B.txt").write_text("b")
+    (temp_dir / "a_dir").mkdir()
+    (temp_dir / "a_dir" / "z.txt").write_text("z")
+    gitignore_spec = load_gitignore(temp_dir, [".gitignore"])
+
+    _, files = collect_tree_and_files(temp_dir, gitignore_spec)
+
+    # Subdirectory files come before the files of their parent directory
+    assert [f.relative_to(temp_dir).as_posix() for f in files] == [
+        "a_dir/z.txt",
+        "subdir/subfile.txt",
+        "B.txt",
+        "test.txt",
+    ]
+
+
+def test_load_gitignore_reuses_compiled_patterns(temp_dir):
+    """Test that repeated loads share compiled patterns instead of recompiling."""
+    first = load_gitignore(temp_dir, DEFAULT_IGNORE_PATTERNS)
+    second = load_gitignore(temp_dir, DEFAULT_IGNORE_PATTERNS + ["extra/"])
+
+    count = len(DEFAULT_IGNORE_PATTERNS)
+    assert all(
+        a is b for a, b in zip(first.patterns[:count], second.patterns[:count])
+    )
+    assert second.match_file("extra/")
+    assert not first.match_file("extra/")
+
+
+def test_collect_tree_and_files_symlinks(temp_dir, tmp_path_factory):
+    """Test that symlinked directories are skipped by default and followed once."""
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "shared.txt").write_text("shared content")
+    (temp_dir / "subdir" / "loop").symlink_to(temp_dir, target_is_directory=True)
+    (temp_dir / "linked").symlink_to(temp_dir / "subdir", target_is_directory=True)
+    (temp_dir / "external").symlink_to(outside, target_is_directory=True)
+    gitignore_spec = load_gitignore(temp_dir, [".gitignore"])
+
+    tree, files = collect_tree_and_files(temp_dir, gitignore_spec)
+    assert tree[temp_dir] == (["subdir"], ["test.txt"])
+
+    # The loop back to the root and the alias of subdir are not walked, but
+    # the real subdir keeps its place even though the alias sorts first
+    tree, files = collect_tree_and_files(
+        temp_dir, gitignore_spec, follow_symlinks=True
+    )
+    assert tree[temp_dir] == (["external", "subdir"], ["test.txt"])
+    assert tree[temp_dir / "subdir"] == ([], ["subfile.txt"])
+    assert tree[temp_dir / "external"] == ([], ["shared.txt"])
+    assert files == [
+        temp_dir / "external" / "shared.txt",
+        temp_dir / "subdir" / "subfile.txt",
+        temp_dir / "test.txt",
+    ]
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["debug.log", "keep.log", "logs/keep.log", "src/main.py", "src/util.py", "x.py"],
+)
+def test_load_gitignore_combined_regex_with_negations(temp_dir, path):
+    """Test that negations in the combined regex follow last-match-wins."""
+    patterns = ["*.log", "!keep.log", "*.py", "!src/*.py", "src/util.py"]
+    (temp_dir / ".gitignore").unlink()
+    gitignore_spec = load_gitignore(temp_dir, patterns)
+    reference = PathSpec.from_lines(GitWildMatchPattern, patterns)
+
+    assert gitignore_spec.match_file(path) == reference.match_file(path)
+
+
+def test_get_files_recursively_permission_denied(temp_dir, monkeypatch):
+    """Test that unreadable directories are skipped instead of aborting the walk."""
+    real_scandir = os.scandir
+    denied = str(temp_dir / "subdir")
+
+    def scandir(path):
+        if path == denied:
+            raise PermissionError(13, "Permission denied", path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    gitignore_spec = load_gitignore(temp_dir, [".gitignore"])
+
+    files = get_files_recursively(temp_dir, gitignore_spec)
+
+    assert files == [temp_dir / "test.txt"]
+
+
+def test_get_files_recursively_never_scans_ignored_directories(temp_dir, monkeypatch):
+    """Test that pruned directories are not listed at all, at any depth."""
+    for ignored in ("node_modules", "subdir/build", ".git"):
+        (temp_dir / ignored).mkdir()
+        (temp_dir / ignored / "file.txt").write_text("ignored")
+    real_scandir = os.scandir
+    scanned = []
+
+    def scandir(path):
+        scanned.append(os.path.relpath(path, temp_dir))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    gitignore_spec = load_gitignore(temp_dir, ["node_modules", "**/build/"])
+
+    get_files_recursively(temp_dir, gitignore_spec)
+
+    assert sorted(scanned) == [".", "subdir"]
+
+
+@pytest.mark.parametrize(
+    "relative_path, is_dir, expected",
+    [
+        ("build", True, True),
+        ("build", False, False),
+        ("src/build", True, True),
+        ("a/temp", True, True),
+        ("a/b/temp", True, True),
+        ("a/temp", False, False),
+        ("a/temp/file.txt", False, True),
+    ],
+)
+def test_should_ignore_directory_patterns(temp_dir, relative_path, is_dir, expected):
+    """Test that directory-only patterns match directories given with is_dir."""
+    gitignore_spec = load_gitignore(temp_dir, ["build/", "**/temp/"])
+
+    path = temp_dir / relative_path
+    assert should_ignore(path, temp_dir, gitignore_spec, is_dir=is_dir) == expected
+
+
+def test_load_gitignore_returns_independent_specs(temp_dir):
+    """Test that each load builds its own spec and picks up .gitignore edits."""
+    first = load_gitignore(temp_dir, ["*.tmp"])
+    # Fill the first spec's directory cache, so the test can check that this
+    # state, like the added pattern below, does not leak into the next load
+    assert first.match_file("temp/file.txt")
+    extended = first
+    extended += PathSpec.from_lines(GitWildMatchPattern, ["secret.txt"])
+
+    second = load_gitignore(temp_dir, ["*.tmp"])
+    assert second is not first
+    assert not second._dir_cache
+    assert not second.match_file("secret.txt")
+
+    # Same size, written immediately: only the content tells them apart
+    (temp_dir / ".gitignore").write_text("*.log\ntmp/")
+    third = load_gitignore(temp_dir, ["*.tmp"])
+    assert third.match_file("tmp/")
+    assert not third.match_file("temp/")
+
+
+def test_load_gitignore_extension_fast_path(temp_dir):
+    """Test that extension patterns match the last component's extension only."""
+    gitignore_spec = load_gitignore(temp_dir, ["*.pyc"])
+
+    assert gitignore_spec.match_file("cache.pyc")
+    assert gitignore_spec.match_file("pkg/module.cpython-312.pyc")
+    assert gitignore_spec.match_file(".pyc")
+    assert gitignore_spec.match_file("build.pyc/readme.txt")
+    assert not gitignore_spec.match_file("pyc")
+    assert not gitignore_spec.match_file("module.pyc.txt")
+    assert not gitignore_spec.match_file("module.PYC")
+
+
+def test_load_gitignore_compiles_patterns_up_front(temp_dir, monkeypatch):
+    """Test that matching never compiles regexes after the spec is built."""
+    gitignore_spec = load_gitignore(temp_dir, DEFAULT_IGNORE_PATTERNS + ["src/*.tmp"])
+
+    def fail_compile(*args, **kwargs):
+        raise AssertionError("regex compiled during matching")
+
+    monkeypatch.setattr(re, "compile", fail_compile)
+
+    assert gitignore_spec.match_file("src/cache.tmp")
+    assert gitignore_spec.match_file("node_modules/")
+    assert not gitignore_spec.match_file("src/main.py")
@@ -4,11 +4,14 @@ import pytest
 from pathspec import PathSpec
 from pathspec.patterns import GitWildMatchPattern
 
+from code_to_prompt.filesystem import collect_tree_and_files
 from code_to_prompt.formatters import (
     generate_directory_tree,
     generate_markdown_output,
     get_file_language,
     get_path_sort_key,
+    iter_markdown_chunks,
+    read_files_in_order,
     sort_files,
 )
 
@@ -72,9 +75,9 @@ def temp_dir(tmp_path):
     return tmp_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def gitignore_spec():
-    """Create a simple gitignore spec for testing."""
+    """Create a simple gitignore spec for testing, shared since specs are read-only."""
     patterns = ["*.log", "temp/"]
     return PathSpec.from_lines(GitWildMatchPattern, patterns)
 
@@ -85,6 +88,9 @@ def test_get_file_language():
         (Path("test.py"), "python"),
         (Path("test.js"), "javascript"),
         (Path("test.md"), "markdown"),
+        (Path("TEST.PY"), "python"),  # Extension lookup is case-insensitive
+        (Path("test.MD"), "markdown"),
+        (Path("Makefile"), ""),  # No extension at all
         (Path("test.unknown"), ""),  # Unknown extension should return empty string
     ]
 
@@ -142,3 +148,109 @@ def test_generate_markdown_output_file_mode(temp_dir, gitignore_spec):
     assert "### File: `test.py`" in output
     assert "```python" in output
     assert "def test(): pass" in output
+
+
+def test_generate_directory_tree_skips_ignored_last_entry(temp_dir):
+    """Test that the last visible entry uses the closing branch when later ones are ignored."""
+    (temp_dir / "zz.log").write_text("ignored")
+    spec = PathSpec.from_lines(GitWildMatchPattern, ["*.log"])
+
+    tree = generate_directory_tree(temp_dir, spec)
+
+    assert "zz.log" not in tree
+    assert tree.splitlines()[-1].startswith("└── ")
+
+
+def test_generate_directory_tree_matches_from_root(temp_dir):
+    """Test that nested entries are matched relative to the root directory."""
+    spec = PathSpec.from_lines(GitWildMatchPattern, ["/subdir/test.js"])
+
+    tree = generate_directory_tree(temp_dir, spec)
+
+    assert "subdir" in tree
+    assert "test.js" not in tree
+
+
+def test_generate_markdown_output_unreadable_file(temp_dir, gitignore_spec):
+    """Test that binary files are listed with a placeholder instead of content."""
+    binary_file = temp_dir / "data.bin"
+    binary_file.write_bytes(b"\x00\x01\x02")
+
+    output = generate_markdown_output(
+        [binary_file], temp_dir, gitignore_spec, is_file_mode=True
+    )
+
+    assert "### File: `data.bin`\n\n*[File content could not be read]*" in output
+
+
+def test_iter_markdown_chunks_matches_full_output(temp_dir, gitignore_spec):
+    """Test that the streamed chunks join to the same output as the full string."""
+    files = [temp_dir / "test.py", temp_dir / "subdir" / "test.js"]
+
+    chunks = list(iter_markdown_chunks(files, temp_dir, gitignore_spec))
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == generate_markdown_output(files, temp_dir, gitignore_spec)
+
+
+def test_iter_markdown_chunks_yields_contents_unwrapped(temp_dir, gitignore_spec):
+    """Test that file contents are yielded as their own chunks, not copied into fences."""
+    files = [temp_dir / "test.py", temp_dir / "readme.md"]
+
+    chunks = list(iter_markdown_chunks(files, temp_dir, gitignore_spec, True))
+
+    assert "def test(): pass" in chunks
+    assert "# Test\nThis is a test" in chunks
+    assert "### File: `test.py`\n\n```python\n" in chunks
+
+
+def test_generate_markdown_output_no_files(temp_dir, gitignore_spec):
+    """Test markdown output generation when every file is ignored."""
+    output = generate_markdown_output([], temp_dir, gitignore_spec)
+
+    assert "# Codebase Contents" in output
+    assert output.endswith("## File Contents\n\n")
+
+
+def test_read_files_in_order_keeps_order_and_failures(temp_dir, monkeypatch):
+    """Test that concurrent reads come back in input order, failures as None."""
+    files = [temp_dir / f"file{i}.txt" for i in range(50)]
+    for i, file in enumerate(files):
+        file.write_text(f"content {i}")
+    denied = files[7]
+    real_open = Path.open
+
+    def open_(self, *args, **kwargs):
+        if self == denied:
+            raise PermissionError(13, "Permission denied", str(self))
+        return real_open(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "open", open_)
+
+    contents = list(read_files_in_order(files))
+
+    assert contents[7] is None
+    assert contents[:7] + contents[8:] == [
+        f"content {i}" for i in range(50) if i != 7
+    ]
+
+
+def test_generate_markdown_output_same_name_different_dirs(tmp_path):
+    """Test that files sharing a name are each emitted once, in tree order."""
+    for directory in ("b", "a", "a/nested"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "util.py").write_text(f"# {directory}")
+    (tmp_path / "util.py").write_text("# root")
+    gitignore_spec = PathSpec.from_lines(GitWildMatchPattern, [])
+    tree, files = collect_tree_and_files(tmp_path, gitignore_spec)
+
+    output = generate_markdown_output(files, tmp_path, gitignore_spec, tree=tree)
+
+    headers = [line for line in output.splitlines() if line.startswith("### File:")]
+    assert headers == [
+        "### File: `a/nested/util.py`",
+        "### File: `a/util.py`",
+        "### File: `b/util.py`",
+        "### File: `util.py`",
+    ]
+    assert output.count("```python\n# a\n```") == 1
@@ -1,9 +1,10 @@
 import io
+import pickle
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from uuid import uuid4
 
 import pytest
-import rich
-import typer
-from rich.console import Console
 
 from code_to_prompt.config import OutputConfig
 from code_to_prompt.handlers import (
@@ -12,39 +13,128 @@ from code_to_prompt.handlers import (
     get_output_handlers,
 )
 
+if TYPE_CHECKING:
+    from rich.console import Console
 
-@pytest.fixture
-def temp_dir(tmp_path):
-    """Provide a temporary directory for file output tests."""
-    return tmp_path
+
+@pytest.fixture(scope="session")
+def _session_tmp(tmp_path_factory):
+    """Create one base directory for all file output tests in the session."""
+    return tmp_path_factory.mktemp("handlers")
 
 
 @pytest.fixture
-def capture_rich_output():
-    """Capture rich console output for testing."""
-    console = Console(file=io.StringIO(), force_terminal=True)
-    # Save the original console
-    original_console = rich.get_console()
-    # Set our test console as the global console
-    rich.get_console = lambda: console
+def temp_dir(_session_tmp):
+    """Provide a fresh subdirectory of the session directory for a test."""
+    case_dir = _session_tmp / f"case_{uuid4().hex}"
+    case_dir.mkdir()
+    return case_dir
+
+
+@lru_cache(maxsize=None)
+def _prototype_console(terminal: bool) -> "Console":
+    """
+    Build a shared console of each kind once, on first use.
 
-    yield console
+    Console set-up (terminal and theme detection) is the costly part, so tests
+    only empty its buffer. Colour is off on the terminal console (as with
+    NO_COLOR) so rendering skips style escape codes the tests never look at.
+    rich is imported here so that collecting this module does not load it.
+    """
+    from rich.console import Console
 
-    # Restore the original console
-    rich.get_console = lambda: original_console
+    if terminal:
+        return Console(
+            file=io.StringIO(), force_terminal=True, width=80, color_system=None
+        )
+    return Console(file=io.StringIO(), width=80)
 
 
-def test_console_output(capture_rich_output):
-    """Test that console output correctly formats markdown content."""
+def _reset_buffer(console: "Console") -> "Console":
+    """Empty a prototype console's buffer in place so it can be reused."""
+    console.file.seek(0)
+    console.file.truncate()
+    return console
+
+
+@pytest.fixture
+def capture_rich_output(monkeypatch):
+    """Capture rich console output for testing."""
+    console = _reset_buffer(_prototype_console(terminal=True))
+    # monkeypatch restores rich.get_console even if the test fails
+    monkeypatch.setattr("rich.get_console", lambda: console)
+    return console
+
+
+def test_console_output(capsys):
+    """Test that console output reaches stdout with its content intact."""
     test_content = "# Test Header\nTest content"
     console_output(test_content)
 
+    # Check that output contains our content
+    output = capsys.readouterr().out
+    assert "Test Header" in output
+    assert "Test content" in output
+
+
+def test_console_output_terminal(capture_rich_output):
+    """Test that console output renders markdown on a terminal."""
+    console_output("# Test Header\nTest content")
+
     # Get the output from our captured console
     output = capture_rich_output.file.getvalue()
 
-    # Check that output contains our content
+    # Rendering styles the header, so the raw markdown marker is gone
     assert "Test Header" in output
     assert "Test content" in output
+    assert "# Test Header" not in output
+
+
+def test_console_output_not_a_terminal(monkeypatch):
+    """Test that console output writes raw markdown when not attached to a terminal."""
+    console = _reset_buffer(_prototype_console(terminal=False))
+    monkeypatch.setattr("rich.get_console", lambda: console)
+
+    test_content = "# Test Header\nTest content"
+    console_output(test_content)
+
+    assert console.file.getvalue() == test_content
+
+
+def test_console_output_raw(capture_rich_output):
+    """Test that raw console output skips markdown rendering on a terminal."""
+    test_content = "# Test Header\nTest content"
+    console_output(iter(["# Test Header\n", "Test content"]), raw=True)
+
+    assert capture_rich_output.file.getvalue() == test_content
+
+
+class _ClosedPipe(io.StringIO):
+    """A stream whose reader has gone away, as when output is piped into head."""
+
+    def write(self, s):
+        raise BrokenPipeError
+
+    def writelines(self, lines):
+        raise BrokenPipeError
+
+
+@pytest.mark.parametrize(
+    "content", ["# Test", iter(["# Test", "\n"])], ids=["string", "chunks"]
+)
+def test_console_output_broken_pipe(monkeypatch, content):
+    """Test that a closed pipe is handed to rich's broken-pipe handling."""
+    from rich.console import Console
+
+    console = Console(file=_ClosedPipe())
+    calls = []
+    # The real handler redirects the process stdout and exits
+    monkeypatch.setattr(console, "on_broken_pipe", lambda: calls.append(True))
+    monkeypatch.setattr("rich.get_console", lambda: console)
+
+    console_output(content)
+
+    assert calls == [True]
 
 
 def test_file_output(temp_dir):
@@ -53,68 +143,107 @@ def test_file_output(temp_dir):
     output_file = temp_dir / "test_output.md"
 
     # Write content to file
-    file_output(test_content, str(output_file))
+    file_output(test_content, output_file)
 
     # Verify file exists and contains correct content
     assert output_file.exists()
-    assert output_file.read_text() == test_content
+    assert output_file.read_bytes().decode() == test_content
 
 
-def test_get_output_handlers_console():
-    """Test that get_output_handlers creates correct console handler."""
-    configs = [OutputConfig(type="console")]
-    handlers = get_output_handlers(configs)
+def test_file_output_chunks(temp_dir):
+    """Test that file output streams an iterable of chunks to the file."""
+    output_file = temp_dir / "test_output.md"
 
-    # Should return a list with one handler
-    assert len(handlers) == 1
-    # Handler should be callable
-    assert callable(handlers[0])
+    file_output(iter(["# Test", "\n", "Chunked content"]), output_file)
 
+    assert output_file.read_bytes().decode() == "# Test\nChunked content"
 
-def test_get_output_handlers_file(temp_dir):
-    """Test that get_output_handlers creates correct file handler."""
-    output_path = temp_dir / "test.md"
-    configs = [OutputConfig(type="file", path=str(output_path))]
-    handlers = get_output_handlers(configs)
 
-    # Should return a list with one handler
-    assert len(handlers) == 1
-    # Handler should be callable
-    assert callable(handlers[0])
+def test_file_output_overwrites(temp_dir):
+    """Test that file output replaces any existing content of the file."""
+    output_file = temp_dir / "test_output.md"
 
-    # Test the handler works
-    test_content = "# Test"
-    handlers[0](test_content)
-    assert output_path.exists()
-    assert output_path.read_text() == test_content
+    file_output("a much longer first payload", output_file)
+    file_output("short", output_file)
 
+    assert output_file.read_bytes().decode() == "short"
 
-def test_get_output_handlers_multiple(temp_dir):
-    """Test that get_output_handlers handles multiple output configurations."""
-    output_path = temp_dir / "test.md"
+
+def test_file_output_utf8(temp_dir):
+    """Test that file output is UTF-8 encoded with newlines written unchanged."""
+    output_file = temp_dir / "test_output.md"
+
+    file_output("# Título\nÜnïcode ✓\n", output_file)
+
+    assert output_file.read_bytes() == "# Título\nÜnïcode ✓\n".encode("utf-8")
+
+
+def test_get_output_handlers_console_raw(capture_rich_output):
+    """Test that get_output_handlers passes the raw option to console handlers."""
+    handlers = get_output_handlers([OutputConfig(type="console")], raw=True)
+
+    handlers[0]("# Test")
+    assert capture_rich_output.file.getvalue() == "# Test"
+
+
+def test_get_output_handlers_multiple_files(temp_dir):
+    """Test that each file handler writes to its own configured path."""
+    first_path = temp_dir / "first.md"
+    second_path = temp_dir / "second.md"
     configs = [
-        OutputConfig(type="console"),
-        OutputConfig(type="file", path=str(output_path)),
+        OutputConfig(type="file", path=str(first_path)),
+        OutputConfig(type="file", path=str(second_path)),
     ]
     handlers = get_output_handlers(configs)
 
-    # Should return two handlers
-    assert len(handlers) == 2
-    # Both handlers should be callable
-    assert all(callable(h) for h in handlers)
-
+    handlers[0]("first")
+    handlers[1]("second")
+    assert first_path.read_bytes().decode() == "first"
+    assert second_path.read_bytes().decode() == "second"
 
-def test_get_output_handlers_invalid_type():
-    """Test that get_output_handlers raises error for invalid output type."""
-    configs = [OutputConfig(type="invalid")]
 
-    with pytest.raises(typer.BadParameter):
-        get_output_handlers(configs)
+def test_get_output_handlers_picklable(temp_dir):
+    """Test that handlers are plain functions or partials that can be pickled."""
+    output_path = temp_dir / "test.md"
+    configs = [
+        OutputConfig(type="console"),
+        OutputConfig(type="file", path=str(output_path)),
+    ]
+    handlers = pickle.loads(pickle.dumps(get_output_handlers(configs, raw=True)))
+
+    handlers[1]("# Test")
+    assert output_path.read_bytes().decode() == "# Test"
+
+
+@pytest.mark.parametrize(
+    "outputs, expected_len, raises",
+    [
+        ([("console", None)], 1, None),
+        ([("file", "test.md")], 1, None),
+        ([("console", None), ("file", "test.md")], 2, None),
+        ([("invalid", None)], None, ValueError),
+        ([("file", None)], None, ValueError),
+    ],
+    ids=["console", "file", "multiple", "invalid-type", "missing-file-path"],
+)
+def test_get_output_handlers(temp_dir, outputs, expected_len, raises):
+    """Test handler creation for each kind of output configuration."""
+    configs = [
+        OutputConfig(type=output_type, path=name and str(temp_dir / name))
+        for output_type, name in outputs
+    ]
 
+    if raises is not None:
+        with pytest.raises(raises):
+            get_output_handlers(configs)
+        return
 
-def test_get_output_handlers_missing_file_path():
-    """Test that get_output_handlers raises error when file path is missing."""
-    configs = [OutputConfig(type="file")]
+    handlers = get_output_handlers(configs)
+    assert len(handlers) == expected_len
+    assert all(callable(h) for h in handlers)
 
-    with pytest.raises(typer.BadParameter):
-        get_output_handlers(configs)
+    # File handlers write to their configured path
+    for config, handler in zip(configs, handlers):
+        if config.type == "file":
+            handler("# Test")
+            assert (temp_dir / "test.md").read_bytes().decode() == "# Test"